@@ -1,97 +1,225 @@
 import os
-import tempfile
+import bisect
 import logging
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import librosa
-import soundfile as sf
-import noisereduce as nr
-from pydub import AudioSegment
-import speech_recognition as sr
+
+# soundfile, torch, torchaudio, noisereduce, scipy and faster_whisper are imported inside
+# the methods that use them so importing this module stays cheap
 
 logger = logging.getLogger(__name__)
 
+# Whisper models expect 16 kHz mono input; every clip is decoded at this rate
+WHISPER_SAMPLE_RATE = 16000
+
+# Non-stationary spectral gate settings, matching noisereduce.reduce_noise defaults
+# (2 s noise-floor time constant, sigmoid slope 10, hop of n_fft // 4) with 80% reduction
+NOISE_GATE_N_FFT = 1024
+NOISE_GATE_TIME_CONSTANT_S = 2.0
+
+# Long clips are split into back-to-back chunks of at most CHUNK_SECONDS (Whisper's
+# own window, so it never hard-cuts a chunk again) and processed in parallel. Cuts are
+# placed in pauses found by voice activity detection so words are not split; a pause
+# must last CHUNK_PAUSE_MS to count. Each chunk is denoised with DENOISE_PADDING_SECONDS
+# of neighbouring audio for context, trimmed off again before transcription
+CHUNK_SECONDS = 30
+CHUNK_PAUSE_MS = 300
+DENOISE_PADDING_SECONDS = 1
+
+# Cores are shared between the chunk workers rather than each worker's torch and
+# CTranslate2 thread pools claiming all of them
+CHUNK_WORKERS = min(4, os.cpu_count() or 1)
+THREADS_PER_WORKER = max(1, (os.cpu_count() or 1) // CHUNK_WORKERS)
+
+# Clips shorter than this get a one-pass Wiener filter instead of noisereduce
+SHORT_CLIP_SECONDS = 45
+WIENER_WINDOW = 2048
+
+# Formats libsndfile (via soundfile) decodes directly; everything else is piped through ffmpeg
+NATIVE_FORMATS = {'.wav', '.flac', '.ogg', '.aiff'}
+
 class AudioProcessor:
     def __init__(self):
-        self.recognizer = sr.Recognizer()
-    
-    def convert_to_wav(self, audio_path: str) -> str:
-        """Convert audio file to WAV format if needed"""
+        import torch
+        from faster_whisper import WhisperModel
+        from noisereduce.torchgate import TorchGate
+
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        if self.device == "cpu":
+            torch.set_num_threads(THREADS_PER_WORKER)
+        self.noise_gate = TorchGate(
+            sr=WHISPER_SAMPLE_RATE,
+            nonstationary=True,
+            n_thresh_nonstationary=2,
+            temp_coeff_nonstationary=0.1,
+            n_movemean_nonstationary=int(
+                NOISE_GATE_TIME_CONSTANT_S / (NOISE_GATE_N_FFT // 4) * WHISPER_SAMPLE_RATE
+            ),
+            prop_decrease=0.8,
+            n_fft=NOISE_GATE_N_FFT,
+        ).to(self.device)
+        self.whisper = WhisperModel(
+            "base.en",
+            device=self.device,
+            compute_type="int8_float16" if self.device == "cuda" else "int8",
+            num_workers=CHUNK_WORKERS,
+            cpu_threads=THREADS_PER_WORKER,
+        )
+
+    def _load(self, audio_path: str) -> tuple[np.ndarray, int]:
+        """Decode audio file into a mono float32 array and its sample rate"""
         try:
             file_extension = os.path.splitext(audio_path)[1].lower()
-            
-            if file_extension == '.wav':
-                return audio_path
-            
-            logger.info(f"Converting {file_extension} to WAV format")
-            audio = AudioSegment.from_file(audio_path)
-            
-            wav_path = tempfile.NamedTemporaryFile(delete=False, suffix='.wav').name
-            audio.export(wav_path, format='wav')
-            
-            return wav_path
+
+            if file_extension in NATIVE_FORMATS:
+                import soundfile as sf
+
+                logger.info(f"Loading {file_extension} audio")
+                samples, sample_rate = sf.read(audio_path, dtype="float32", always_2d=True)
+                samples = samples.mean(axis=1)
+
+                # Nothing downstream benefits from more than 16 kHz, and the noise gate is built for it
+                if sample_rate != WHISPER_SAMPLE_RATE:
+                    import torch
+                    import torchaudio
+
+                    samples = torchaudio.functional.resample(
+                        torch.from_numpy(samples), sample_rate, WHISPER_SAMPLE_RATE
+                    ).numpy()
+                    sample_rate = WHISPER_SAMPLE_RATE
+
+                return samples, sample_rate
+
+            logger.info(f"Decoding {file_extension} audio to mono 16 kHz with ffmpeg")
+            result = subprocess.run(
+                [
+                    "ffmpeg", "-nostdin", "-loglevel", "error",
+                    "-i", audio_path,
+                    "-f", "s16le", "-ac", "1", "-ar", str(WHISPER_SAMPLE_RATE),
+                    "-",
+                ],
+                capture_output=True,
+            )
+            if result.returncode != 0:
+                raise RuntimeError(f"ffmpeg failed: {result.stderr.decode(errors='replace').strip()}")
+
+            # One int16 -> float32 conversion, then scale in place rather than allocating again
+            samples = np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32)
+            samples *= 1.0 / 32768.0
+
+            return samples, WHISPER_SAMPLE_RATE
         except Exception as e:
-            logger.error(f"Error converting audio to WAV: {str(e)}")
+            logger.error(f"Error loading audio: {str(e)}")
             raise
-    
-    def reduce_noise(self, audio_path: str) -> str:
-        """Apply noise reduction to audio file"""
+
+    def _wiener_filter(self, audio_data: np.ndarray) -> np.ndarray:
+        """Apply a fast one-pass Wiener filter to audio samples"""
+        try:
+            from scipy.signal import wiener
+
+            logger.info("Applying Wiener noise filter")
+            filtered = wiener(audio_data, mysize=WIENER_WINDOW)
+
+            # Silent input gives 0/0 in the filter's gain, so zero out any NaNs
+            return np.nan_to_num(filtered, copy=False).astype(np.float32)
+        except Exception as e:
+            logger.error(f"Error applying Wiener filter: {str(e)}")
+            return audio_data
+
+    def _denoise(self, audio_data: np.ndarray) -> np.ndarray:
+        """Apply noise reduction to audio samples"""
         try:
-            logger.info("Loading audio for noise reduction")
-            audio_data, sample_rate = librosa.load(audio_path, sr=None)
-            
-            logger.info("Applying noise reduction")
-            reduced_noise = nr.reduce_noise(y=audio_data, sr=sample_rate, prop_decrease=0.8)
-            
-            cleaned_path = tempfile.NamedTemporaryFile(delete=False, suffix='.wav').name
-            sf.write(cleaned_path, reduced_noise, sample_rate)
-            
-            logger.info(f"Noise reduction complete, saved to {cleaned_path}")
-            return cleaned_path
+            import torch
+
+            logger.info(f"Applying noise reduction on {self.device}")
+            with torch.inference_mode():
+                samples = torch.from_numpy(audio_data).unsqueeze(0).to(self.device)
+                reduced_noise = self.noise_gate(samples).squeeze(0).cpu().numpy()
+
+            logger.info("Noise reduction complete")
+            return reduced_noise
         except Exception as e:
             logger.error(f"Error reducing noise: {str(e)}")
-            return audio_path
-    
-    def transcribe_audio(self, audio_path: str) -> str:
-        """Transcribe audio to text using speech recognition"""
+            return audio_data
+
+    def _transcribe(self, audio_data: np.ndarray) -> str:
+        """Transcribe audio samples to text using a local Whisper model"""
         try:
-            with sr.AudioFile(audio_path) as source:
-                logger.info("Reading audio file")
-                audio_data = self.recognizer.record(source)
-                
-                logger.info("Transcribing audio using Google Speech Recognition")
-                text = self.recognizer.recognize_google(audio_data)
-                
-                return text
-        except sr.UnknownValueError:
-            logger.error("Speech recognition could not understand audio")
-            raise Exception("Could not understand the audio. Please ensure it contains clear speech.")
-        except sr.RequestError as e:
-            logger.error(f"Could not request results from speech recognition service: {e}")
-            raise Exception(f"Speech recognition service error: {e}")
+            logger.info("Transcribing audio using faster-whisper")
+            segments, _ = self.whisper.transcribe(
+                audio_data.astype(np.float32, copy=False),
+                language="en",
+                vad_filter=True,
+                without_timestamps=True,
+            )
+
+            return " ".join(segment.text.strip() for segment in segments)
         except Exception as e:
             logger.error(f"Error transcribing audio: {str(e)}")
             raise
-    
+
+    def _split(self, audio_data: np.ndarray, sample_rate: int) -> list[tuple[int, int]]:
+        """Split a clip into back-to-back (start, end) sample ranges, cutting inside pauses"""
+        max_length = CHUNK_SECONDS * sample_rate
+        if len(audio_data) <= max_length:
+            return [(0, len(audio_data))]
+
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+        speech = get_speech_timestamps(
+            audio_data,
+            VadOptions(min_silence_duration_ms=CHUNK_PAUSE_MS, speech_pad_ms=CHUNK_PAUSE_MS // 3),
+            sampling_rate=sample_rate,
+        )
+        # Candidate cuts: the middle of every pause, plus the edges of leading/trailing silence
+        cuts = [(before["end"] + after["start"]) // 2 for before, after in zip(speech, speech[1:])]
+        if speech:
+            cuts = [speech[0]["start"]] + cuts + [speech[-1]["end"]]
+
+        bounds = []
+        start = 0
+        while len(audio_data) - start > max_length:
+            # Latest pause that keeps this chunk within max_length; with none (over 30 s of
+            # unbroken speech) fall back to a hard cut
+            index = bisect.bisect_right(cuts, start + max_length) - 1
+            end = cuts[index] if index >= 0 and cuts[index] > start else start + max_length
+            bounds.append((start, end))
+            start = end
+        bounds.append((start, len(audio_data)))
+
+        return bounds
+
+    def _process_chunk(self, audio_data: np.ndarray, start: int, end: int, denoise: bool) -> str:
+        """Optionally denoise, then transcribe the samples between start and end"""
+        if not denoise:
+            return self._transcribe(audio_data[start:end])
+
+        padding = DENOISE_PADDING_SECONDS * WHISPER_SAMPLE_RATE
+        padded_start = max(0, start - padding)
+        denoised = self._denoise(audio_data[padded_start:end + padding])
+
+        return self._transcribe(denoised[start - padded_start:end - padded_start])
+
     def process_audio(self, audio_path: str) -> str:
         """
-        Complete audio processing pipeline:
-        1. Convert to WAV if needed
-        2. Apply noise reduction
-        3. Transcribe to text
+        Complete audio processing pipeline, kept in memory between stages:
+        1. Decode to mono samples
+        2. Wiener-filter short clips as a whole
+        3. Split into back-to-back chunks at pauses in speech
+        4. Apply noisereduce (long clips only) and transcribe each chunk in parallel
         """
-        wav_path = None
-        cleaned_path = None
-        
-        try:
-            wav_path = self.convert_to_wav(audio_path)
-            
-            cleaned_path = self.reduce_noise(wav_path)
-            
-            text = self.transcribe_audio(cleaned_path)
-            
-            return text
-        finally:
-            if wav_path and wav_path != audio_path and os.path.exists(wav_path):
-                os.unlink(wav_path)
-            if cleaned_path and os.path.exists(cleaned_path):
-                os.unlink(cleaned_path)
+        audio_data, sample_rate = self._load(audio_path)
+
+        denoise = len(audio_data) >= SHORT_CLIP_SECONDS * sample_rate
+        if not denoise:
+            audio_data = self._wiener_filter(audio_data)
+
+        bounds = self._split(audio_data, sample_rate)
+        if len(bounds) == 1:
+            return self._process_chunk(audio_data, *bounds[0], denoise)
+
+        logger.info(f"Processing {len(bounds)} chunks with {CHUNK_WORKERS} workers")
+        with ThreadPoolExecutor(max_workers=CHUNK_WORKERS) as executor:
+            texts = executor.map(lambda chunk: self._process_chunk(audio_data, *chunk, denoise), bounds)
+            return " ".join(text for text in texts if text)
@@ -1,14 +1,28 @@
 import os
-import json
+import hashlib
+import httpx
+import orjson
 import logging
 from google import genai
 from google.genai import types
 from pydantic import BaseModel
+from collections import OrderedDict
 from typing import List, Optional
 
 logger = logging.getLogger(__name__)
 
-client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
+# One long-lived HTTP/2 connection pool so concurrent extractions share
+# connections instead of paying a TCP/TLS handshake per call
+client = genai.Client(
+    api_key=os.environ.get("GEMINI_API_KEY"),
+    http_options=types.HttpOptions(
+        timeout=30000,
+        async_client_args={
+            "http2": True,
+            "limits": httpx.Limits(max_keepalive_connections=32, keepalive_expiry=120),
+        },
+    ),
+)
 
 class Medicine(BaseModel):
     name: str
@@ -38,16 +52,7 @@ class MedicalData(BaseModel):
     test_results: List[TestResult] = []
     other_observations: Optional[str] = None
 
-class MedicineExtractor:
-    def __init__(self):
-        self.model = "gemini-2.5-pro"
-    
-    def extract_medicine_data(self, text: str) -> dict:
-        """
-        Extract comprehensive medical data from prescription text using Gemini Vision Pro
-        """
-        try:
-            system_prompt = """You are a comprehensive medical data analyzer. Extract all relevant medical information from the given text.
+SYSTEM_PROMPT = """You are a comprehensive medical data analyzer. Extract all relevant medical information from the given text.
 
 Extract the following information:
 
@@ -75,25 +80,56 @@ Extract the following information:
 If any field is not mentioned in the text, use null or an empty array as appropriate.
 Be precise and extract exact information from the text."""
 
+# JSON schema generated once so the SDK does not convert MedicalData on every call
+MEDICAL_DATA_SCHEMA = MedicalData.model_json_schema()
+
+# The system prompt is sent inline rather than through Gemini context caching:
+# at roughly 300 tokens it is well below the minimum size explicit caches accept
+GENERATE_CONFIG = types.GenerateContentConfig(
+    system_instruction=SYSTEM_PROMPT,
+    response_mime_type="application/json",
+    response_json_schema=MEDICAL_DATA_SCHEMA,
+)
+
+# Number of extraction results kept in memory, keyed by SHA-256 of the input text
+RESULT_CACHE_SIZE = 1024
+
+class MedicineExtractor:
+    def __init__(self, model: str = "gemini-2.5-flash"):
+        self.model = model
+        self._result_cache: OrderedDict[str, str] = OrderedDict()
+    
+    async def extract_medicine_data(self, text: str) -> dict:
+        """
+        Extract comprehensive medical data from prescription text using Gemini
+        """
+        try:
+            cache_key = hashlib.sha256(text.encode()).hexdigest()
+            cached_json = self._result_cache.get(cache_key)
+            if cached_json is not None:
+                logger.info(f"Returning cached medical data for text: {text[:100]}...")
+                self._result_cache.move_to_end(cache_key)
+                # Parsing the stored JSON hands every caller its own copy
+                return orjson.loads(cached_json)
+            
             logger.info(f"Extracting comprehensive medical data from text: {text[:100]}...")
             
-            response = client.models.generate_content(
+            response = await client.aio.models.generate_content(
                 model=self.model,
                 contents=[
                     types.Content(role="user", parts=[types.Part(text=text)])
                 ],
-                config=types.GenerateContentConfig(
-                    system_instruction=system_prompt,
-                    response_mime_type="application/json",
-                    response_schema=MedicalData,
-                ),
+                config=GENERATE_CONFIG,
             )
             
             raw_json = response.text
             logger.info(f"Gemini response: {raw_json}")
             
             if raw_json:
-                data = json.loads(raw_json)
+                data = orjson.loads(raw_json)
+                self._result_cache[cache_key] = raw_json
+                if len(self._result_cache) > RESULT_CACHE_SIZE:
+                    self._result_cache.popitem(last=False)
                 return data
             else:
                 raise ValueError("Empty response from Gemini model")
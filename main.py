@@ -1,10 +1,14 @@
 import os
+import shutil
+import asyncio
+import threading
 import tempfile
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+import msgspec
 from typing import Optional, List
 import json
 import logging
@@ -15,7 +19,10 @@ from gemini_extractor import MedicineExtractor
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Medical Prescription Processing System")
+app = FastAPI(
+    title="Medical Prescription Processing System",
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,16 +32,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-audio_processor = AudioProcessor()
+# Level 4 keeps compression cheap while still shrinking the JSON payloads severalfold;
+# the middleware also sets Vary: Accept-Encoding
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=4)
+
 medicine_extractor = MedicineExtractor()
 
-class MedicineData(BaseModel):
+# Uploads are copied to disk in chunks of this size, off the event loop
+UPLOAD_COPY_CHUNK_SIZE = 1 << 20
+
+# Created on the first audio request so text-only and health traffic never load the audio stack
+audio_processor: Optional[AudioProcessor] = None
+audio_processor_lock = threading.Lock()
+
+def get_audio_processor() -> AudioProcessor:
+    """Return the shared AudioProcessor, creating it on first use"""
+    global audio_processor
+    with audio_processor_lock:
+        if audio_processor is None:
+            audio_processor = AudioProcessor()
+        return audio_processor
+
+class MedicineData(msgspec.Struct):
     medicines: List[dict]
     raw_text: str
 
-class TextInput(BaseModel):
+class TextInput(msgspec.Struct):
     text: str
 
+# TextInput is decoded by msgspec rather than FastAPI, so its schema is declared for
+# OpenAPI by hand; the component is inlined because msgspec.json.schema() returns a
+# $ref into its own $defs, which does not resolve inside the OpenAPI document
+TEXT_INPUT_SCHEMA = msgspec.json.schema_components([TextInput])[1]["TextInput"]
+
 @app.post("/api/process-audio")
 async def process_audio(file: UploadFile = File(...)):
     """
@@ -54,13 +84,14 @@ async def process_audio(file: UploadFile = File(...)):
             )
         
         with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_audio:
-            content = await file.read()
-            temp_audio.write(content)
+            await asyncio.to_thread(shutil.copyfileobj, file.file, temp_audio, UPLOAD_COPY_CHUNK_SIZE)
             temp_audio_path = temp_audio.name
         
         try:
             logger.info(f"Processing audio file: {file.filename}")
-            transcribed_text = audio_processor.process_audio(temp_audio_path)
+            transcribed_text = await asyncio.to_thread(
+                lambda: get_audio_processor().process_audio(temp_audio_path)
+            )
             
             if not transcribed_text or transcribed_text.strip() == "":
                 raise HTTPException(
@@ -70,13 +101,13 @@ async def process_audio(file: UploadFile = File(...)):
             
             logger.info(f"Transcribed text: {transcribed_text}")
             
-            medicine_data = medicine_extractor.extract_medicine_data(transcribed_text)
+            medicine_data = await medicine_extractor.extract_medicine_data(transcribed_text)
             
-            return JSONResponse(content={
+            return {
                 "success": True,
                 "transcribed_text": transcribed_text,
                 "medicine_data": medicine_data
-            })
+            }
             
         finally:
             if os.path.exists(temp_audio_path):
@@ -88,24 +119,37 @@ async def process_audio(file: UploadFile = File(...)):
         logger.error(f"Error processing audio: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error processing audio: {str(e)}")
 
-@app.post("/api/process-text")
-async def process_text(input_data: TextInput):
+@app.post(
+    "/api/process-text",
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/json": {"schema": TEXT_INPUT_SCHEMA}},
+            "required": True,
+        }
+    },
+)
+async def process_text(request: Request):
     """
     Process text input directly to extract medicine data
     """
     try:
+        try:
+            input_data = msgspec.json.decode(await request.body(), type=TextInput)
+        except msgspec.DecodeError as e:
+            raise HTTPException(status_code=422, detail=f"Invalid request body: {str(e)}")
+        
         if not input_data.text or input_data.text.strip() == "":
             raise HTTPException(status_code=400, detail="Text input cannot be empty")
         
         logger.info(f"Processing text input: {input_data.text}")
         
-        medicine_data = medicine_extractor.extract_medicine_data(input_data.text)
+        medicine_data = await medicine_extractor.extract_medicine_data(input_data.text)
         
-        return JSONResponse(content={
+        return {
             "success": True,
             "input_text": input_data.text,
             "medicine_data": medicine_data
-        })
+        }
     
     except HTTPException:
         raise